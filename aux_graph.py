@@ -1,6 +1,21 @@
+from functools import lru_cache
+
 from dpll import CNFSAT
 
 
+def _bits(mask: int):
+    """
+    Iterates over the indices of the set bits of a bitmask, lowest first.
+
+    :param mask: A non-negative integer.
+    :return: A generator enumerating the positions of the bits set in `mask`.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
 class NCPQMatching:
     """
     Class defining the Non-Crossing Perfect Quasi-Matching problem.
@@ -20,15 +35,48 @@ class NCPQMatching:
         !! WARNING !! Assumes that the vertices are disposed on a circle in order of value, that loops do not cross any
         edge, and that edges between two vertices are straight lines.
         """
-        self._graph = pseudo_graph  # Vertices of the pseudo-graph are positive integers.
-        self._edges = {(min(u, v), max(u, v)) for u, neigh in pseudo_graph.items() for v in neigh}  # The edges of
+        # Vertices of the pseudo-graph are non-negative integers. Each adjacency set is stored as a bitmask
+        # (bit `v` set iff `v` is a neighbour of the vertex), so neighbour scans are bit manipulations on a
+        # machine-word-sized integer instead of set iterations.
+        self._adj = {u: sum(1 << v for v in neigh) for u, neigh in pseudo_graph.items()}
+        self._setup()
+
+    @classmethod
+    def from_bitmasks(cls, adj: dict[int, int]) -> "NCPQMatching":
+        """
+        Constructs an instance of `NCPQMatching` directly from bitmask adjacency, skipping the set conversion of
+        `__init__`; this is the constructor used by the hot path of `PatternReducibility`.
+
+        :param adj: A pseudo-graph represented by a dictionary mapping each vertex to the bitmask of its neighbours.
+
+        !! WARNING !! Same plane-embedding assumptions as `__init__`.
+        """
+        instance = cls.__new__(cls)
+        instance._adj = adj
+        instance._setup()
+        return instance
+
+    def _setup(self) -> None:
+        """
+        Builds the edge set, the dense edge variable ids and the cache key from the bitmask adjacency.
+        """
+        self._edges = {(min(u, v), max(u, v)) for u, mask in self._adj.items() for v in _bits(mask)}  # The edges of
         # the pseudo-graph. By convention, the smaller vertex of the edge is written first to prevent duplications.
+        # A canonical hashable form of the pseudo-graph, used to cache matchability results across the many
+        # identical instances rebuilt by `PatternReducibility`; bitmasks are already canonical, so the (vertex,
+        # mask) pairs only need sorting.
+        self._key = tuple(sorted(self._adj.items()))
+        # Each edge gets a dense propositional variable id in 1..|E|: the solver data structures are indexed by
+        # variable, so gaps in the id space would only waste bits and heap entries.
+        self._edge_id = {e: i + 1 for i, e in enumerate(sorted(self._edges))}
 
     @staticmethod
     def _crossing(edge1: tuple[int, int], edge2: tuple[int, int]) -> bool:
         """
         Computes whether two edges of `self` are crossing.
 
+        Kept as the reference definition; the clause construction in `_clauses` inlines this test in its pair loop.
+
         :param edge1: An edge of `self`, represented as a tuple containing 2 integers.
         :param edge2: Idem.
         :return: `True` if `edge1` and `edge2` are crossing, `False` otherwise.
@@ -45,46 +93,224 @@ class NCPQMatching:
 
         :param u: A vertex of `self`.
         :param v: Idem.
-        :return: Returns the (injective) integer representation of x_{u, v}.
+        :return: Returns the (injective) integer representation of x_{u, v}: the dense id of the edge, in 1..|E|.
         """
         assert((min(u, v), max(u, v)) in self._edges)
-        bound = max(self._graph.keys()) + 1  # Strictly greater than the difference between any two vertices.
-        # Bound is used to ensure the representation is injective:
-        return bound * min(u, v) + max(u, v)
+        return self._edge_id[(min(u, v), max(u, v))]
 
-    def _formula(self) -> CNFSAT:
+    def _clauses(self) -> list[set[int]]:
         """
-        This is a polynomial reduction from NCPQM to CNF-SAT.
+        Builds the clauses of the reduction from NCPQM to CNF-SAT (see `_formula`).
 
-        :return: A boolean formula in Conjunctive Normal Form that is
-        satisfiable if and only if `self` is a positive instance of NCPQM, i.e.
-        `self` has a non-crossing perfect quasi-matching.
-        The propositional variables will be the x_{u, v} for {u, v} edge of `self`.
+        :return: A list of clauses, each represented by a set of literals, whose conjunction is satisfiable if and
+        only if `self` is a positive instance of NCPQM.
         """
         # We build the clauses of the boolean formula.
         clauses = []
 
         # For each vertex `u`:
-        for u in self._graph.keys():
+        for u, mask in self._adj.items():
+            neighbours = list(_bits(mask))
             # - `u` must see at most one edge (quasi-matching).
             # For any two distinct adjacent vertices `v` and `v2`:
-            for v in self._graph[u]:
-                for v2 in self._graph[u]:
+            for v in neighbours:
+                for v2 in neighbours:
                     if v != v2:
                         # This clause prevents `u` from seeing both {`u`, `v`} and {`u`, `v2`}:
                         clauses.append({-self._var(u, v), -self._var(u, v2)})
 
             # - `u` must be covered by the matching (perfect).
             # This clause forces `u` to see at least one edge:
-            clauses.append({self._var(u, v) for v in self._graph[u]})
+            clauses.append({self._var(u, v) for v in neighbours})
 
-        # For each pair of edges:
-        for (u1, v1) in self._edges:
-            for (u2, v2) in self._edges:
-                if NCPQMatching._crossing((u1, v1), (u2, v2)):  # `(u1, v1)` and `(u2, v2)` are crossing
+        # For each unordered pair of distinct edges; the crossing test of `_crossing` is inlined and the variable of
+        # each edge is computed once, so the quadratic loop does nothing but arithmetic.
+        edges = sorted(self._edges)
+        edge_vars = [self._var(u, v) for (u, v) in edges]
+        for a in range(len(edges)):
+            u1, v1 = edges[a]
+            for b in range(a + 1, len(edges)):
+                u2, v2 = edges[b]
+                if (u1 - u2) * (u1 - v2) * (v1 - u2) * (v1 - v2) < 0:  # The two edges are crossing.
                     # This clause prevents choosing both (non-crossing):
-                    clauses.append({-self._var(u1, v1), -self._var(u2, v2)})
-        return CNFSAT(clauses)
+                    clauses.append({-edge_vars[a], -edge_vars[b]})
+        return clauses
+
+    def _formula(self) -> CNFSAT:
+        """
+        This is a polynomial reduction from NCPQM to CNF-SAT.
+
+        :return: A boolean formula in Conjunctive Normal Form that is
+        satisfiable if and only if `self` is a positive instance of NCPQM, i.e.
+        `self` has a non-crossing perfect quasi-matching.
+        The propositional variables will be the x_{u, v} for {u, v} edge of `self`.
+        """
+        return CNFSAT(self._clauses())
+
+    @staticmethod
+    def _two_sat_assignment(clauses: list[set[int]]) -> dict[int, bool]:
+        """
+        Solves an instance of 2-SAT (every clause has at most two literals) with the Aspvall-Plass-Tarjan method:
+        a clause {a, b} is the pair of implications (not a -> b) and (not b -> a); the instance is satisfiable if
+        and only if no variable lies in the same strongly connected component of the implication digraph as its
+        negation, and a satisfying valuation can be read off the components in reverse topological order.
+
+        :param clauses: A list of clauses of size at most 2 (an empty clause makes the instance unsatisfiable).
+        :return: A satisfying valuation as a (variable -> boolean) dictionary covering the variables appearing in
+        `clauses`, or `None` if the instance is not satisfiable.
+        """
+        graph = {}  # The implication digraph, as a (literal -> list of implied literals) mapping.
+
+        def _node(lit: int) -> list[int]:
+            if lit not in graph:
+                graph[lit] = []
+                graph[-lit] = []
+            return graph[lit]
+
+        for c in clauses:
+            if len(c) == 0:
+                return None
+            if len(c) == 1:
+                (a,) = c
+                _node(-a).append(a)
+            else:
+                a, b = c
+                _node(-a).append(b)
+                _node(-b).append(a)
+
+        # Iterative Tarjan algorithm; components are numbered in the order they complete, which is a reverse
+        # topological order of the condensation.
+        index = {}
+        low = {}
+        comp = {}
+        stack = []
+        on_stack = set()
+        counter = 0
+        n_comps = 0
+        for root in graph:
+            if root in index:
+                continue
+            work = [(root, 0)]
+            while work:
+                lit, edge_i = work.pop()
+                if edge_i == 0:
+                    index[lit] = low[lit] = counter
+                    counter += 1
+                    stack.append(lit)
+                    on_stack.add(lit)
+                successors = graph[lit]
+                recursed = False
+                for j in range(edge_i, len(successors)):
+                    succ = successors[j]
+                    if succ not in index:
+                        work.append((lit, j + 1))
+                        work.append((succ, 0))
+                        recursed = True
+                        break
+                    if succ in on_stack:
+                        low[lit] = min(low[lit], index[succ])
+                if recursed:
+                    continue
+                if low[lit] == index[lit]:
+                    # `lit` is the root of a new strongly connected component.
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        comp[member] = n_comps
+                        if member == lit:
+                            break
+                    n_comps += 1
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[lit])
+
+        valuation = {}
+        for lit in graph:
+            var = abs(lit)
+            if var in valuation:
+                continue
+            if comp[var] == comp[-var]:
+                return None  # The variable and its negation are equivalent: not satisfiable.
+            # A component completed earlier is a sink side of the condensation, hence safe to set to `True`.
+            valuation[var] = comp[var] < comp[-var]
+        return valuation
+
+    @staticmethod
+    def _solve_with_2sat_core(short: list[set[int]], long: list[set[int]]) -> bool:
+        """
+        Computes the satisfiability of the conjunction of `short` and `long` by solving the 2-SAT core `short`
+        directly and branching only on the literals of the clauses of `long` that the core valuation leaves
+        unsatisfied.
+
+        :param short: A list of clauses of size at most 2.
+        :param long: A list of clauses of size at least 3.
+        :return: `True` if the conjunction of all the clauses is satisfiable, `False` otherwise.
+        """
+        valuation = NCPQMatching._two_sat_assignment(short)
+        if valuation is None:
+            return False
+        for c in long:
+            # A variable absent from the 2-SAT core is unconstrained so far; we count it as `False` and let the
+            # branching below try to set it.
+            if not any(valuation.get(abs(lit), False) == (lit > 0) for lit in c):
+                # The core valuation does not satisfy `c`, but another one might: any satisfying valuation must
+                # make some literal of `c` true, so we branch on each of them as an added unit clause.
+                return any(NCPQMatching._solve_with_2sat_core(short + [{lit}], long) for lit in c)
+        return True
+
+    def _try_2sat_core(self) -> bool:
+        """
+        Attempts to decide `self` by exploiting the structure of the reduction: the at-most-one and non-crossing
+        clauses all have two literals, and only the covering clauses (one per vertex of degree at least 3) can be
+        longer, so the formula is almost an instance of 2-SAT.
+
+        :return: `True` or `False` if the instance could be decided this way, `None` if the clauses are not
+        predominantly of size at most 2 and the general solver should be used instead.
+        """
+        clauses = self._clauses()
+        short = [c for c in clauses if len(c) <= 2]
+        long = [c for c in clauses if len(c) > 2]
+        if 2 * len(long) > len(clauses):
+            return None  # The structure assumption does not hold; branching could degenerate.
+        return NCPQMatching._solve_with_2sat_core(short, long)
+
+    def _solve(self) -> bool:
+        """
+        Computes whether `self` is a positive instance of NCPQM, without going through the cache.
+
+        :return: `True` if there exists a non-crossing perfect quasi-matching of `self`, `False` otherwise.
+        """
+        result = self._try_2sat_core()
+        if result is not None:
+            return result
+        return self._formula().dpll()
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _matchable_cached(key: tuple) -> bool:
+        """
+        Computes whether the pseudo-graph given in canonical form is a positive instance of NCPQM, caching the
+        result so that the same pseudo-graph is never solved twice.
+
+        :param key: A pseudo-graph in the canonical (vertex, bitmask) form built by `_setup`.
+        :return: `True` if there exists a non-crossing perfect quasi-matching of the pseudo-graph, `False` otherwise.
+        """
+        return NCPQMatching.from_bitmasks(dict(key))._solve()
+
+    def _trivial(self) -> bool:
+        """
+        Detects the instances that can be decided by an O(|V|) look at the pseudo-graph, without any solving:
+
+        - a vertex without any neighbour can never be covered, so the instance is negative;
+        - if every vertex carries a loop, selecting exactly the loops is a non-crossing perfect quasi-matching
+          (loops do not cross anything by the plane-embedding assumption of the class), so the instance is positive.
+
+        :return: `True` or `False` if the instance is trivially decided as above, `None` otherwise.
+        """
+        if any(not mask for mask in self._adj.values()):
+            return False
+        if all((mask >> u) & 1 for u, mask in self._adj.items()):
+            return True
 
     def matchable(self) -> bool:
         """
@@ -92,4 +318,7 @@ class NCPQMatching:
 
         :return: `True` if there exists a non-crossing perfect quasi-matching of `self`, `False` otherwise.
         """
-        return self._formula().dpll()
+        result = self._trivial()
+        if result is not None:
+            return result
+        return NCPQMatching._matchable_cached(self._key)
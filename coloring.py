@@ -1,6 +1,12 @@
-from utils import Color
+from functools import lru_cache
+
+from utils import Color, COLOR_NONE, COLOR_SET
 from dpll import CNFSAT
 
+# For each color, the two others, hoisted to module level so that the per-vertex and per-edge loops of `_formula`
+# do not rebuild small sets on every iteration.
+OTHER_COLORS = {1: (2, 3), 2: (1, 3), 3: (1, 2)}
+
 
 class ThreeColoration:
     """
@@ -19,11 +25,20 @@ class ThreeColoration:
         :Example:
 
         `ThreeColoration([[1], [0, 2, 3], [1, 3], [1, 2, 4, 8], [3, 5, 6, 8], [4, 6], [4, 5, 7], [6], [3, 4, 9], [8]],
-                 {0: Color.ONE, 2: Color.ONE, 5: Color.ONE, 7: Color.ONE, 9: Color.TWO})`
+                 {0: 1, 2: 1, 5: 1, 7: 1, 9: 2})`
         """
         self._n = len(adj)
         self._constraints = constraints
         self._edges = {frozenset((u, v)) for u in range(self._n) for v in adj[u]}
+        self._edge_list = [tuple(e) for e in self._edges]  # Flat form of the edges, cheaper to iterate than the set.
+        # A canonical hashable form of the instance, used to cache colorability results across the many instances
+        # sharing the same graph built by `PatternReducibility`.
+        self._key = (tuple(tuple(neighbours) for neighbours in adj),
+                     frozenset((constraints or {}).items()))
+        # Per-instance caches for the `colorable_with` entry point: the constraint-free clause skeletons, keyed by
+        # constrained-vertex set, and the extendability results, keyed by constraints.
+        self._skeletons = {}
+        self._results = {}
 
     def _var(self, vertex: int, color: int):
         """
@@ -48,11 +63,11 @@ class ThreeColoration:
         clauses = []
 
         for u in range(self._n):
-            color = int(self._constraints.get(u, Color.NONE))
+            color = self._constraints.get(u, COLOR_NONE)
             if color != 0:  # We already fixed the color of `u`.
                 # This clause forces `u` to be colored by `color`:
                 clauses.append({self._var(u, color)})
-                for other_color in {1, 2, 3} - {color}:
+                for other_color in OTHER_COLORS[color]:
                     # This clause prevents `u` from being colored by `other_color`:
                     clauses.append({-self._var(u, other_color)})
 
@@ -64,16 +79,150 @@ class ThreeColoration:
                 clauses.append({-self._var(u, 1), -self._var(u, 3)})
                 clauses.append({-self._var(u, 2), -self._var(u, 3)})
 
-        for (u, v) in self._edges:
-            for color in {1, 2, 3}:
+        for (u, v) in self._edge_list:
+            for color in COLOR_SET:
                 # This clause prevents `u` and `v` from being both colored by `color`:
                 clauses.append({-self._var(u, color), -self._var(v, color)})
         return CNFSAT(clauses)
 
+    def _skeleton(self, constrained: frozenset) -> list[set[int]]:
+        """
+        Builds the clauses that do not depend on the colors assigned to the constrained vertices: the color-choice
+        clauses of the free vertices and the edge clauses. The skeleton is cached per constrained-vertex set, so
+        repeated extendability checks on the same graph only rebuild the few unit clauses that differ per call.
+
+        :param constrained: The set of vertices whose color is fixed by the caller.
+        :return: The list of clauses shared by every instance constraining exactly the vertices of `constrained`.
+        """
+        skeleton = self._skeletons.get(constrained)
+        if skeleton is None:
+            skeleton = []
+            for u in range(self._n):
+                if u not in constrained:
+                    # This clause forces `u` to be colored by at least one color from {1, 2, 3}:
+                    skeleton.append({self._var(u, 1), self._var(u, 2), self._var(u, 3)})
+                    # These clauses prevent `u` from being colored by two colors at once:
+                    skeleton.append({-self._var(u, 1), -self._var(u, 2)})
+                    skeleton.append({-self._var(u, 1), -self._var(u, 3)})
+                    skeleton.append({-self._var(u, 2), -self._var(u, 3)})
+            for (u, v) in self._edge_list:
+                for color in COLOR_SET:
+                    # This clause prevents `u` and `v` from being both colored by `color`:
+                    skeleton.append({-self._var(u, color), -self._var(v, color)})
+            self._skeletons[constrained] = skeleton
+        return skeleton
+
+    def colorable_with(self, constraints: dict[int, Color]) -> bool:
+        """
+        Computes whether `constraints` is extendable into a 3-coloration of the graph of `self`, ignoring the
+        constraints given at construction. Unlike `colorable`, this reuses the clause skeleton across calls, so
+        checking many constraint sets on the same graph only builds the per-call unit clauses.
+
+        :param constraints: A dictionary of (vertex to color) constraints.
+        :return: `True` if `constraints` is extendable into a 3-coloration of the graph, `False` otherwise.
+        """
+        key = frozenset((u, color) for u, color in constraints.items() if color != COLOR_NONE)
+        if key not in self._results:
+            clauses = list(self._skeleton(frozenset(u for u, _ in key)))
+            for u, color in key:
+                # This clause forces `u` to be colored by `color`:
+                clauses.append({self._var(u, color)})
+                for other_color in OTHER_COLORS[color]:
+                    # This clause prevents `u` from being colored by `other_color`:
+                    clauses.append({-self._var(u, other_color)})
+            self._results[key] = CNFSAT(clauses).dpll()
+        return self._results[key]
+
+    def colorable_batch(self, vertices: list[int], assignments: list[tuple[Color, ...]]) -> list[bool]:
+        """
+        Decides extendability for many assignments of colors to the same vertices at once. The assignments are
+        explored as a prefix tree in the given order: a shared prefix is propagated only once, and a prefix whose
+        propagation already empties some domain prunes every assignment below it without ever reaching the solver.
+        Propagation alone is not complete, so the surviving leaves are delegated to `colorable_with`.
+
+        :param vertices: The vertices being assigned, in a fixed order.
+        :param assignments: A list of color tuples, one color per vertex of `vertices`; assignments sharing a
+        prefix should be contiguous (e.g. sorted) for the sharing to pay off.
+        :return: The list of extendability results, aligned with `assignments`.
+        """
+        neighbours = [[] for _ in range(self._n)]
+        for (u, v) in self._edge_list:
+            neighbours[u].append(v)
+            neighbours[v].append(u)
+        # The domain of each vertex is a bitmask over the colors (bit `color` set iff `color` is still possible).
+        domains = [0b1110] * self._n
+
+        def _restrict(v: int, mask: int, trail: list) -> bool:
+            """
+            Intersects the domain of `v` with `mask`, recording the previous domain on `trail`; when the domain
+            becomes a singleton, removes that color from the neighbours of `v` (unit propagation).
+
+            :return: `False` if some domain became empty (the current prefix is not extendable), `True` otherwise.
+            """
+            old = domains[v]
+            new = old & mask
+            if new == old:
+                return True
+            if new == 0:
+                return False
+            domains[v] = new
+            trail.append((v, old))
+            if new.bit_count() == 1:
+                forbid = ~new
+                for w in neighbours[v]:
+                    if not _restrict(w, forbid, trail):
+                        return False
+            return True
+
+        results = [None] * len(assignments)
+
+        def _explore(lo: int, hi: int, depth: int) -> None:
+            """
+            Decides the assignments of indices `lo` to `hi` (excluded), which all share their first `depth`
+            colors — already propagated into `domains`.
+            """
+            if depth == len(vertices):
+                for index in range(lo, hi):
+                    results[index] = self.colorable_with(dict(zip(vertices, assignments[index])))
+                return
+            i = lo
+            while i < hi:
+                # The block of assignments sharing the next color, explored under one propagation.
+                color = assignments[i][depth]
+                j = i
+                while j < hi and assignments[j][depth] == color:
+                    j += 1
+                trail = []
+                if _restrict(vertices[depth], 1 << color, trail):
+                    _explore(i, j, depth + 1)
+                else:
+                    # The prefix alone is contradictory: every assignment of the block is not extendable.
+                    for index in range(i, j):
+                        results[index] = False
+                for v, old in reversed(trail):
+                    domains[v] = old
+                i = j
+
+        _explore(0, len(assignments), 0)
+        return results
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _colorable_cached(key: tuple) -> bool:
+        """
+        Computes whether the instance given in canonical form is a positive instance of 3-Coloration, caching the
+        result so that the same instance is never solved twice.
+
+        :param key: An instance in the canonical form built by `__init__`.
+        :return: `True` if the coloration is extendable into a 3-coloration of the graph, `False` otherwise.
+        """
+        adj, constraints = key
+        return ThreeColoration([list(neighbours) for neighbours in adj], dict(constraints))._formula().dpll()
+
     def colorable(self) -> bool:
         """
         Computes whether `self` is a positive instance of 3-Coloration.
 
         :return: `True` if there exists a 3-coloration of `self` respecting the input constraints, `False` otherwise.
         """
-        return self._formula().dpll()
+        return ThreeColoration._colorable_cached(self._key)
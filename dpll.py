@@ -1,4 +1,11 @@
-from copy import deepcopy
+import heapq
+
+try:
+    # Optional native backend: if the PySAT bindings are installed, satisfiability checks are delegated to the
+    # CaDiCaL solver, which is orders of magnitude faster than the pure-Python solver below on large formulas.
+    from pysat.solvers import Cadical153 as _Cadical
+except ImportError:
+    _Cadical = None
 
 
 class CNFSAT:
@@ -8,123 +15,445 @@ class CNFSAT:
     CNF-SAT is the problem whose instances are the formulas of propositional logic that are in Conjunctive Normal Form,
     and an instance is positive if it is satisfiable, i.e. if there exists a valuation for which it is true.
     """
+
+    # Saved phases are shared across solver instances: the formulas built within one `PatternReducibility` run
+    # reuse the same variable ids, so the polarity a variable last held in a sibling solve is a good first guess.
+    _saved_phase = {}
+
     def __init__(self, clauses: list[set[int]]) -> None:
         """
         Constructs an instance of `CNFSAT`.
-        
+
         :param clauses: A list of clauses, where each clause is represented by a set of literals, where the literals
         are represented by integers, with a positive integer `n` representing the propositional variable x_n,
         and a negative  integer `-n` representing the negation of the propositional variable x_n.
         """
-        self._clauses = clauses
+        # The clauses in the list-of-lists form expected by the PySAT backend, when it is available.
+        self._int_clauses = [list(c) for c in clauses] if _Cadical is not None else None
+
+        # Internally, each clause is stored as an immutable pair of bitmasks `(pos, neg)`: bit `n` of `pos`
+        # (resp. `neg`) is set if the literal `n` (resp. `-n`) belongs to the clause. Clauses are never rewritten:
+        # the solver instead builds a partial valuation, kept as the two variable bitmasks `_val_true` and
+        # `_val_false`, and tests clauses against it with a few bitwise operations.
+        self._clauses = []
+
+        # Bitmasks of the variables currently assigned `True` (resp. `False`); the trail of assigned literals in
+        # assignment order; and `_qhead`, the index of the first trail literal whose consequences have not been
+        # propagated yet.
+        self._val_true = 0
+        self._val_false = 0
+        self._trail = []
+        self._qhead = 0
+
+        # For every assigned variable, the decision level at which it was assigned and the index of the clause that
+        # implied it (`None` for a decision). `_level_marks[d]` is the trail length when decision level `d + 1` was
+        # opened; the current decision level is `len(_level_marks)`, level 0 being the root.
+        self._levels = {}
+        self._reasons = {}
+        self._level_marks = []
+
+        # Two-watched-literals scheme: each clause with at least two literals watches two of them, and `_watches`
+        # maps each watched literal to the indices of the clauses watching it. Assigning a literal only visits the
+        # clauses watching its negation, instead of rescanning the whole clause list on every propagation step.
+        self._watches = {}
+        self._units = []  # The (literal, clause index) unit clauses to be propagated at level 0.
+        self._has_empty = False  # Whether the formula contains an empty clause.
+        for c in clauses:
+            self._add_clause(*CNFSAT._clause_to_masks(c))
+
+        # Decision heuristic (VSIDS): each variable carries an activity score, initialized with its Jeroslow-Wang
+        # weight (short clauses weigh more), bumped when it takes part in a conflict analysis, and decayed
+        # multiplicatively by letting the bump amount grow. Decisions pick the unassigned variable of highest
+        # activity, through a max-heap with lazy deletion, and give it its last assigned polarity first
+        # (phase saving).
+        self._activity = {}
+        for pos, neg in self._clauses:
+            weight = 2.0 ** -(pos.bit_count() + neg.bit_count())
+            mask = pos | neg
+            while mask:
+                var = (mask & -mask).bit_length() - 1
+                self._activity[var] = self._activity.get(var, 0.0) + weight
+                mask &= mask - 1
+        self._heap = [(-score, var) for var, score in self._activity.items()]
+        heapq.heapify(self._heap)
+        self._phase = CNFSAT._saved_phase  # Shared phase store (see above).
+        self._bump = 1.0  # The current activity increment; dividing it by `_decay` at each conflict decays
+        # every existing score relative to future bumps.
+        self._decay = 0.95
+
+    @staticmethod
+    def _clause_to_masks(clause: set[int]) -> tuple[int, int]:
+        """
+        Converts a clause from its set-of-literals representation to its bitmask representation.
+
+        :param clause: A clause represented by a set of literals.
+        :return: The pair of bitmasks `(pos, neg)` representing `clause`.
+        """
+        pos = 0
+        neg = 0
+        for lit in clause:
+            if lit > 0:
+                pos |= 1 << lit
+            else:
+                neg |= 1 << -lit
+        return pos, neg
+
+    def _add_clause(self, pos: int, neg: int, watch1: int = None, watch2: int = None) -> int:
+        """
+        Appends a clause, given in bitmask representation, to the clause list, and registers its watched literals.
 
-    def _literals(self) -> set[int]:
+        :param pos: The bitmask of the positive literals of the clause.
+        :param neg: The bitmask of the negative literals of the clause.
+        :param watch1: The first literal to watch; if `None`, the two lowest literals of the clause are watched.
+        :param watch2: The second literal to watch.
+        :return: The index of the new clause.
         """
-        Describes the literals in the formula.
+        i = len(self._clauses)
+        self._clauses.append((pos, neg))
+        size = pos.bit_count() + neg.bit_count()
+        if size == 0:
+            self._has_empty = True
+        elif size == 1:
+            self._units.append((CNFSAT._first_literal(pos, neg), i))
+        else:
+            if watch1 is None:
+                watch1 = CNFSAT._first_literal(pos, neg)
+                bit = 1 << abs(watch1)
+                watch2 = CNFSAT._first_literal(pos & ~bit, neg & ~bit)
+            self._watches.setdefault(watch1, []).append(i)
+            self._watches.setdefault(watch2, []).append(i)
+        return i
 
-        :return: Returns a *new* set listing every literal present in the formula.
+    @staticmethod
+    def _first_literal(pos: int, neg: int) -> int:
+        """
+        Returns one literal of a clause given in bitmask representation.
+
+        :param pos: The bitmask of the positive literals of the clause.
+        :param neg: The bitmask of the negative literals of the clause.
+        :return: The literal of lowest variable of the clause, positively if possible; `None` for an empty clause.
+        """
+        if pos:
+            low = pos & -pos
+            if not neg or low < (neg & -neg):
+                return low.bit_length() - 1
+        if neg:
+            return -((neg & -neg).bit_length() - 1)
+
+    def _satisfied(self, i: int) -> bool:
+        """
+        :param i: A clause index.
+        :return: `True` if clause `i` is satisfied by the current partial valuation, `False` otherwise.
         """
-        return set().union(*self._clauses)
+        pos, neg = self._clauses[i]
+        return bool(pos & self._val_true or neg & self._val_false)
 
-    def _find_unit_literal(self) -> int:
+    def _enqueue(self, lit: int, reason: int) -> bool:
         """
-        A unit literal is a literal that appears alone in a clause.
+        Gives the value `True` to `lit` in the current partial valuation, recording it on the trail for both undoing
+        and propagation, together with its decision level and the clause that implied it.
 
-        :return: Returns a unit literal if there is one, `None` otherwise; without modifying `self`.
+        :param lit: A literal.
+        :param reason: The index of the clause that forces `lit`, or `None` for a decision.
+        :return: `True` if the assignment was made (or `lit` was already `True`), `False` if `lit` is already
+        `False`, which is a conflict.
         """
-        for c in self._clauses:
-            if len(c) == 1:
-                return set(c).pop()
+        var = abs(lit)
+        bit = 1 << var
+        if (self._val_true if lit > 0 else self._val_false) & bit:
+            return True  # `lit` is already `True`.
+        if (self._val_false if lit > 0 else self._val_true) & bit:
+            return False  # `lit` is already `False`: conflict.
+        if lit > 0:
+            self._val_true |= bit
+        else:
+            self._val_false |= bit
+        self._trail.append(lit)
+        self._levels[var] = len(self._level_marks)
+        self._reasons[var] = reason
+        self._phase[var] = lit > 0  # Phase saving: remember the last polarity given to the variable.
+        return True
 
-    def _find_pure_literal(self) -> int:
+    def _backjump(self, level: int) -> None:
         """
-        A pure literal is a literal that appears in the formula but whose negation does not.
+        Rewinds the trail down to the state it had when decision level `level` was the current one, unassigning
+        every literal recorded past that point. The watch lists are untouched: a watched literal that became false
+        was dealt with when it was assigned, and unassigning it simply makes it watchable again.
 
-        :return: Returns a pure literal if there is one, `None` otherwise; without modifying `self`.
+        :param level: The decision level to jump back to.
         """
-        lits = self._literals()
-        for lit in lits:
-            if -lit not in lits:
+        mark = self._level_marks[level] if level < len(self._level_marks) else len(self._trail)
+        while len(self._trail) > mark:
+            lit = self._trail.pop()
+            var = abs(lit)
+            bit = 1 << var
+            if lit > 0:
+                self._val_true &= ~bit
+            else:
+                self._val_false &= ~bit
+            del self._levels[var]
+            del self._reasons[var]
+            # The variable becomes decidable again, so we push it back for the decision heap to consider; stale
+            # duplicates are skipped lazily when popping.
+            heapq.heappush(self._heap, (-self._activity.get(var, 0.0), var))
+        del self._level_marks[level:]
+        self._qhead = len(self._trail)
+
+    def _propagate(self) -> int:
+        """
+        Propagates the consequences of the trail literals not processed yet: assigning a literal visits only the
+        clauses watching its negation. A visited clause either is already satisfied, finds a new non-false literal
+        to watch, becomes a unit clause (its remaining literal is assigned with the clause as reason), or becomes
+        empty (a conflict).
+
+        :return: The index of a conflicting clause, or `None` if propagation completed without conflict.
+        """
+        # This is the hottest loop of the solver, so every instance attribute it touches is hoisted into a local
+        # variable, and the assignment of unit literals is inlined, sparing an attribute load and a method call per
+        # visited clause. The valuation masks and the queue head are written back on every exit path.
+        clauses = self._clauses
+        watches = self._watches
+        trail = self._trail
+        levels = self._levels
+        reasons = self._reasons
+        phase = self._phase
+        val_true = self._val_true
+        val_false = self._val_false
+        level = len(self._level_marks)
+        qhead = self._qhead
+        try:
+            while qhead < len(trail):
+                lit = trail[qhead]
+                qhead += 1
+                bit = 1 << (lit if lit > 0 else -lit)
+
+                # The negation of `lit` just became false: we visit the clauses watching it.
+                watch_list = watches.get(-lit)
+                if watch_list is None:
+                    continue
+                kept = []  # The clauses that keep watching the negation of `lit`.
+                for w, i in enumerate(watch_list):
+                    pos, neg = clauses[i]
+                    if pos & val_true or neg & val_false:
+                        kept.append(i)  # Clause `i` is already satisfied.
+                        continue
+                    # The non-false literals of clause `i`, excluding the one that just became false.
+                    free_pos = pos & ~val_false & ~(bit if lit < 0 else 0)
+                    free_neg = neg & ~val_true & ~(bit if lit > 0 else 0)
+                    replacement = self._find_new_watch(i, free_pos, free_neg)
+                    if replacement is not None:
+                        # Clause `i` now watches `replacement` instead of the negation of `lit`.
+                        watches.setdefault(replacement, []).append(i)
+                        continue
+                    # No replacement: the other watched literal is the last chance to satisfy clause `i`.
+                    other = CNFSAT._first_literal(free_pos, free_neg)
+                    kept.append(i)
+                    if other is None:
+                        # Every literal of clause `i` is false: conflict.
+                        kept.extend(watch_list[w + 1:])
+                        watches[-lit] = kept
+                        return i
+                    # Clause `i` is now a unit clause: `other` must be `True`. Since the clause is not satisfied,
+                    # `other` is unassigned, so the assignment of `_enqueue` is done inline.
+                    var = other if other > 0 else -other
+                    if other > 0:
+                        val_true |= 1 << var
+                    else:
+                        val_false |= 1 << var
+                    trail.append(other)
+                    levels[var] = level
+                    reasons[var] = i
+                    phase[var] = other > 0
+                watches[-lit] = kept
+        finally:
+            self._qhead = qhead
+            self._val_true = val_true
+            self._val_false = val_false
+
+    def _find_new_watch(self, i: int, free_pos: int, free_neg: int) -> int:
+        """
+        Searches the non-false literals of clause `i` for one that the clause is not already watching.
+
+        :param i: A clause index.
+        :param free_pos: The bitmask of the non-false positive literals of the clause, minus the failing watch.
+        :param free_neg: Idem for the negative literals.
+        :return: A suitable new watched literal, or `None` if the clause has at most one non-false literal left.
+        """
+        watches = self._watches
+        mask = free_pos
+        while mask:
+            low = mask & -mask
+            lit = low.bit_length() - 1
+            if i not in watches.get(lit, ()):
+                return lit
+            mask &= mask - 1
+        mask = free_neg
+        while mask:
+            low = mask & -mask
+            lit = -(low.bit_length() - 1)
+            if i not in watches.get(lit, ()):
                 return lit
+            mask &= mask - 1
 
-    def _unit_propagate(self, lit: int) -> None:
+    def _analyze(self, conflict: int) -> tuple[list[int], int, int]:
         """
-        If `lit` is a unit literal, its value must be set to `True` if `self` is to be satisfied.
-        There are thus two operations we can do to simplify `self`:
+        Analyzes a conflict with the first-unique-implication-point (1-UIP) scheme: starting from the conflicting
+        clause, the literals assigned at the current decision level are resolved away against their reason clauses,
+        walking the trail backwards, until exactly one literal of the current level remains. The disjunction of that
+        literal's negation with the lower-level literals met on the way is a clause implied by the formula — the
+        learned clause — and it becomes a unit clause once the solver jumps back to the second-highest level in it.
 
-        - remove all clauses containing `lit`, since `lit` being set to `True` satisfies those clauses;
-        - remove the negation of `lit` from all remaining clauses, since `lit` being set to `True` means that the
-          negation of `lit` is set to `False`, which prevents it from helping to satisfy those clauses.
+        Every variable met during the analysis is also rewarded in the activity scores.
 
-        This method will apply this simplification to `self`.
+        :param conflict: The index of the conflicting clause.
+        :return: The triple `(learned, uip, level)` where `learned` is the learned clause as a list of literals
+        whose last element is the asserting literal `uip`, and `level` is the decision level to jump back to.
+        """
+        current = len(self._level_marks)
+        seen = set()
+        learned = []  # The literals of the learned clause coming from lower decision levels.
+        path = 0  # The number of unresolved variables of the current decision level.
+        idx = len(self._trail) - 1
+        reason = conflict
+        uip_var = None  # The variable whose reason clause is being resolved, skipped during the scan.
+
+        while True:
+            pos, neg = self._clauses[reason]
+            mask = (pos | neg) & ~(1 << uip_var if uip_var is not None else 0)
+            while mask:
+                var = (mask & -mask).bit_length() - 1
+                mask &= mask - 1
+                if var in seen:
+                    continue
+                level = self._levels[var]
+                if level == 0:
+                    continue  # Literals forced at the root level can never help satisfy the clause.
+                seen.add(var)
+                self._bump_var(var)
+                if level == current:
+                    path += 1
+                else:
+                    # The literal as it appears in the clause (it is currently false).
+                    learned.append(var if pos & (1 << var) else -var)
+
+            # We move to the next trail literal taking part in the conflict.
+            while abs(self._trail[idx]) not in seen:
+                idx -= 1
+            uip = self._trail[idx]
+            uip_var = abs(uip)
+            idx -= 1
+            seen.discard(uip_var)
+            path -= 1
+            if path == 0:
+                # `uip` is the first unique implication point: every path from the current decision to the conflict
+                # goes through it.
+                break
+            reason = self._reasons[uip_var]
 
-        :param lit: A unit literal.
+        self._decay_activity()
+        if learned:
+            level = max(self._levels[abs(lit)] for lit in learned)
+        else:
+            level = 0
+        learned.append(-uip)
+        return learned, -uip, level
+
+    def _bump_var(self, var: int) -> None:
         """
-        self._clauses = [c - {-lit} for c in self._clauses if lit not in c]
+        Rewards a variable taking part in a conflict analysis by increasing its activity.
 
-    def _pure_literal_assign(self, lit: int) -> None:
+        :param var: A variable.
         """
-        If `lit` is a pure literal, we can drop the clauses that contain it.
-        Indeed, if the new formula is satisfiable, by adding (`lit` -> `True`) to a valuation that satisfies the new
-        formula, we obtain a valuation that satisfies `self`. Conversely, if `self` is satisfiable, then any valuation
-        that satisfies `self` also satisfies the new formula because it is smaller.
+        score = self._activity.get(var, 0.0) + self._bump
+        self._activity[var] = score
+        heapq.heappush(self._heap, (-score, var))
 
-        This method will apply this simplification to self.
+    def _decay_activity(self) -> None:
+        """
+        Decays every activity score relative to future bumps, by growing the bump amount.
+        """
+        self._bump /= self._decay
+        if self._bump > 1e100:
+            # We rescale every score to keep the floats in range; relative order is preserved.
+            for var in self._activity:
+                self._activity[var] /= 1e100
+            self._bump /= 1e100
+            self._heap = [(-score, var) for var, score in self._activity.items()]
+            heapq.heapify(self._heap)
 
-        :param lit: A pure literal.
+    def _all_satisfied(self) -> bool:
+        """
+        :return: `True` if every clause is satisfied by the current partial valuation, `False` otherwise.
         """
-        self._clauses = [c for c in self._clauses if lit not in c]
+        val_true = self._val_true
+        val_false = self._val_false
+        return all(pos & val_true or neg & val_false for pos, neg in self._clauses)
 
-    def _choose_literal_rnd(self) -> int:
+    def _choose_literal_vsids(self) -> int:
         """
-        Returns a literal appearing in `self`.
+        Returns the literal to branch on: the unassigned variable of highest activity, with its saved phase as
+        polarity.
 
-        :return: A literal of `self` if there is any, raises a `KeyError` otherwise.
+        :return: The chosen literal, or `None` if every variable is assigned.
         """
-        return self._literals().pop()
+        assigned = self._val_true | self._val_false
+        while self._heap:
+            neg_score, var = heapq.heappop(self._heap)
+            if (1 << var) & assigned or -neg_score != self._activity[var]:
+                continue  # The entry concerns an assigned variable or is stale: lazy deletion.
+            return var if self._phase.get(var, True) else -var
 
     def dpll(self) -> bool:
         """
-        Computes whether `self` is satisfiable.
+        Computes whether `self` is satisfiable, with conflict-driven clause learning on top of the classic DPLL
+        propagation: decisions and unit propagation build a valuation; every conflict is analyzed into a learned
+        clause (1-UIP) that makes the solver jump straight back to the level where that clause becomes a unit
+        clause, instead of chronologically undoing the last decision.
 
         :return: `True` if `self` is satisfiable, `False` otherwise.
         """
-        if self._clauses == []:
-            # If `self` does not have any clause, it is trivially satisfiable.
-            return True
-        if set() in self._clauses:
+        if _Cadical is not None:
+            # The native CaDiCaL solver settles the formula directly.
+            with _Cadical(bootstrap_with=self._int_clauses) as solver:
+                return solver.solve()
+
+        if self._has_empty:
             # If `self` has an empty clause, that clause will never be satisfied, so `self` is not satisfiable.
             return False
 
-        # We simplify `self` using the unit propagation rule.
-        unit_lit = self._find_unit_literal()
-        while unit_lit is not None:
-            self._unit_propagate(unit_lit)
-            unit_lit = self._find_unit_literal()
-
-        # We simplify `self` using the pure literal rule.
-        pure_lit = self._find_pure_literal()
-        while pure_lit is not None:
-            self._pure_literal_assign(pure_lit)
-            pure_lit = self._find_pure_literal()
-
-        # We check again if `self` is trivially satisfiable or trivially non-satisfiable, in case the simplifications
-        # helped.
-        if not self._clauses:
-            return True
-        if set() in self._clauses:
+        # We first propagate the unit clauses of the formula at the root level.
+        for lit, i in self._units:
+            if not self._enqueue(lit, i):
+                return False  # Two contradictory unit clauses.
+        if self._propagate() is not None:
             return False
 
-        # If the simplifications were not enough to conclude, we need to make a manual choice. We select a literal
-        # appearing in `self`, and we branch on its value: we try to recursively satisfy either the formula where we
-        # give it the value `True` or the formula where we give it the value `False`. If either is satisfiable,
-        # then `self` is satisfiable. Otherwise, `self` is not satisfiable.
-        lit = self._choose_literal_rnd()
+        while True:
+            if self._all_satisfied():
+                # Every clause is satisfied by the current partial valuation.
+                return True
+            lit = self._choose_literal_vsids()
+            if lit is None:
+                # Every variable is assigned and no conflict arose, so every clause is satisfied.
+                return True
+
+            # We open a new decision level and give `lit` the value `True`.
+            self._level_marks.append(len(self._trail))
+            self._enqueue(lit, None)
 
-        clauses = deepcopy(self._clauses)
-        clauses.append({lit})  # We add the clause giving the value `True` to `lit`.
-        if CNFSAT(clauses).dpll():
-            return True
+            conflict = self._propagate()
+            while conflict is not None:
+                if not self._level_marks:
+                    # A conflict at the root level: `self` is not satisfiable.
+                    return False
+                learned, asserting, level = self._analyze(conflict)
+                self._backjump(level)
 
-        self._clauses.append({-lit})  # We add the clause giving the value `False` to `lit`.
-        return CNFSAT(self._clauses).dpll()
+                # We record the learned clause and assert its unique literal of the conflict level, which is now
+                # unit at the backjump level. The clause watches that literal and one of its deepest false
+                # literals, so the watch invariant holds.
+                pos, neg = CNFSAT._clause_to_masks(set(learned))
+                deepest = max(learned[:-1], key=lambda l: self._levels[abs(l)], default=None)
+                i = self._add_clause(pos, neg, asserting, deepest)
+                self._enqueue(asserting, i)
+                conflict = self._propagate()
@@ -1,11 +1,25 @@
 from reductor import PatternReducibility
 
 
+def _ranks(pattern: PatternReducibility) -> dict:
+    """
+    Collects the distribution of the computed ranks of a pattern, as a (rank -> number of colorings) dictionary.
+    The assertions below check it on top of the reducibility verdict: the verdict alone cannot catch a regression
+    of the fixed point that ranks the right colorings in the wrong iterations.
+    """
+    ranks = {}
+    for data in pattern.repr_to_red.values():
+        ranks[data["rank"]] = ranks.get(data["rank"], 0) + 1
+    return ranks
+
+
 p_22 = PatternReducibility([[1], [0, 2], [1]], [0, 2], [[0, 1], [1, 0]])
 assert(p_22.is_pattern_reducible())
+assert(_ranks(p_22) == {0: 2})
 
 p_232 = PatternReducibility([[1], [0, 2, 3], [1, 3], [1, 2, 4], [3]], [0, 2, 4], [[0, 1, 2], [2, 1, 0]])
 assert(p_232.is_pattern_reducible())
+assert(_ranks(p_232) == {0: 3, 1: 1})
 
 p_3_2x3 = PatternReducibility(
      [[1], [0, 2, 3], [1, 3], [1, 2, 4, 8], [3, 5, 6, 8], [4, 6], [4, 5, 7], [6], [3, 4, 9], [8]],
@@ -13,6 +27,7 @@ p_3_2x3 = PatternReducibility(
      [[0, 1, 2, 3, 4], [3, 2, 1, 0, 4]]
 )
 assert(p_3_2x3.is_pattern_reducible())
+assert(_ranks(p_3_2x3) == {0: 14, 1: 5, 2: 4, 3: 2})
 
 p_233_2x2 = PatternReducibility(
      [[1], [0, 2, 3], [1, 3], [1, 2, 4, 8], [3, 5, 6, 8], [4, 6], [4, 5, 7], [6], [3, 4, 9], [8]],
@@ -20,6 +35,8 @@ p_233_2x2 = PatternReducibility(
      [[0, 1, 2, 3, 4]]
 )
 assert(p_233_2x2.is_pattern_reducible())
+assert(_ranks(p_233_2x2) == {0: 26, 1: 9, 2: 5, 3: 1})
+assert(p_233_2x2.repr_to_red[(1, 2, 2, 2, 3)] == {"rank": 2, "reason": "reducible with color pair 2/3"})
 
 p_3_2x233_2 = PatternReducibility(
      [
@@ -30,6 +47,7 @@ p_3_2x233_2 = PatternReducibility(
      [[0, 1, 2, 3, 4, 5]]
 )
 assert(p_3_2x233_2.is_pattern_reducible())
+assert(_ranks(p_3_2x233_2) == {0: 56, 1: 23, 2: 13, 3: 14, 4: 15, 5: 1})
 
 p_7 = PatternReducibility(
      [
@@ -40,6 +58,8 @@ p_7 = PatternReducibility(
      [[0, 1, 2, 3, 4, 5], [5, 4, 3, 2, 1, 0]]
 )
 assert(p_7.is_pattern_reducible())
+assert(_ranks(p_7) == {0: 38, 1: 13, 2: 12, 3: 5, 4: 2})
+assert(p_7.repr_to_red[(1, 2, 2, 3, 1, 2)] == {"rank": 2, "reason": "reducible with color pair 1/2"})
 
 critical_face = PatternReducibility(
      [
@@ -50,3 +70,4 @@ critical_face = PatternReducibility(
      [[0, 1, 2, 3, 4], [1, 0, 4, 3, 2]]
 )
 assert(not critical_face.is_pattern_reducible())
+assert(_ranks(critical_face) == {0: 12, 1: 2, 2: 2, 3: 1, float("inf"): 8})
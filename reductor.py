@@ -1,6 +1,46 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
 from utils import *
 from coloring import ThreeColoration
 from aux_graph import NCPQMatching
+from reductor_core import make_aux_builder
+
+
+# The shared `ThreeColoration` instance of a worker process, installed once by `_init_worker`: shipping it through
+# the executor's initializer means each map call only pickles the small per-representative constraints dictionary,
+# not the line graph.
+_worker_base = None
+
+
+def _init_worker(coloration: ThreeColoration) -> None:
+    """
+    Initializer of the extendability-check worker processes; module-level so that worker processes can import it.
+
+    :param coloration: The shared `ThreeColoration` instance of the line graph, without constraints.
+    """
+    global _worker_base
+    _worker_base = coloration
+
+
+def _colorable_batch(vertices: list[int], assignments: list) -> list[bool]:
+    """
+    Worker for the batched extendability checks of `PatternReducibility.__init__`; module-level so that worker
+    processes can import it.
+
+    :param vertices: The outgoing vertices of the line graph.
+    :param assignments: A list of color tuples, one color per vertex of `vertices`.
+    :return: The list of extendability results, aligned with `assignments`.
+    """
+    return _worker_base.colorable_batch(vertices, assignments)
+
+
+# Sentinel rank of the colorings not (yet) known to be reducible. Ranks are stored in a flat byte array indexed by
+# coloring code, so "infinity" is the largest byte value; actual ranks never come close (they are bounded by the
+# number of fixed-point iterations, a handful in practice).
+_INF_RANK = 255
 
 
 class PatternReducibility:
@@ -9,7 +49,8 @@ class PatternReducibility:
 
     Pattern Reducibility is the problem whose instances are patterns, and an instance is positive if it is reducible.
     """
-    def __init__(self, line_graph: list[list[int]], outgoing: list[int], symmetries: list[list[int]]) -> None:
+    def __init__(self, line_graph: list[list[int]], outgoing: list[int], symmetries: list[list[int]],
+                 jobs: int = 1) -> None:
         """
         Constructs an instance of `PatternReducibility`.
 
@@ -21,6 +62,10 @@ class PatternReducibility:
         :param symmetries: List of symmetries of the outgoing vertices.
             !! WARNING !! It must start with the identity.
 
+        :param jobs: Number of worker processes used for the per-representative extendability checks, which are
+            independent instances sharing the same line graph. The default of `1` keeps everything in the current
+            process; `None` uses one worker per processor core.
+
         :Example:
 
         See the patterns.py file for examples.
@@ -28,175 +73,307 @@ class PatternReducibility:
         self.line_graph = line_graph
         self.outgoing = outgoing
         self.k = len(outgoing)
-        self.symmetries = symmetries
+        # Symmetries are stored as tuples: they are indexed repeatedly when building the per-symmetry tables, and
+        # tuples are both cheaper to index and safe against accidental mutation of the caller's lists.
+        self.symmetries = [tuple(sym) for sym in symmetries]
 
         # We use the word "coloring" as a shorthand for "frontier coloring" when the context makes it clear.
 
+        # Colorings are manipulated in integer-coded form (see `utils`): 2 bits per outgoing vertex holding
+        # (color - 1), the first vertex in the most significant pair of bits. Swapping two colors thus becomes a
+        # XOR, comparing colorings becomes an integer comparison, and the per-coloring mappings below become plain
+        # lists indexed by code (of size 4^k; the codes with a digit equal to 3 are unused padding).
+        self._shifts = [2 * (self.k - 1 - i) for i in range(self.k)]
+        n_codes = 1 << (2 * self.k)
+
         # Two colorings are color-equivalent if they are equal up to a color permutation;
         # the color-representative of a coloring is the lexicographically minimal color-equivalent of that coloring.
 
         # Similarly, two colorings are equivalent if they are equal up to a color permutation and a symmetry;
         # and the representative of a coloring is the lexicographically minimal equivalent of that coloring.
 
-        # Maps the representatives of the colorings to their reducibility and rank.
-        self.repr_to_red = {}
+        # The reducibility data is stored in flat-array form: `_representatives` lists the representative codes,
+        # and `_rank` is a byte array indexed directly by coloring code (`_INF_RANK` meaning "not known to be
+        # reducible"). The hot rank probe in `_make_aux_graph` is thus a single byte-array indexing. The reasons
+        # only matter for display, so they live in a small dictionary keyed by the codes that actually got a rank.
+        # The historical `repr_to_red` dict-of-dicts remains available as a read-only property.
+        self._representatives = []
+        self._rank = array("B", bytes([_INF_RANK]) * n_codes)
+        self._reason = {}
+
+        # The codes of the three monochromatic colorings (digit color - 1 at every position), precomputed once so
+        # that `_is_coloring_reducible` does not rebuild them on every call.
+        unit = sum(1 << s for s in self._shifts)
+        self._mono = [0, unit, 2 * unit]
+
+        # Applying a symmetry to a coded coloring is a fixed shuffle of its 2-bit digits, and the shuffle is linear
+        # over the digits: the image of a code is the image of its high half OR-ed with the image of its low half.
+        # Each symmetry is therefore precomputed once as a pair of lookup tables over the half-code values, turning
+        # every symmetry application of the constructor into two table loads instead of a k-step bit shuffle.
+        self._low_bits = 2 * (self.k // 2)
+        self._low_mask = (1 << self._low_bits) - 1
+        self._sym_tables = []
+        for sym in self.symmetries:
+            high = [self._apply_symmetry(h << self._low_bits, sym) for h in range(n_codes >> self._low_bits)]
+            low = [self._apply_symmetry(l, sym) for l in range(1 << self._low_bits)]
+            self._sym_tables.append((high, low))
+
+        # The (code -> representative code) table `_full_repr` fuses the two historical layers
+        # (color-representative first, then symmetry-representative) into a single stored table. The
+        # color-representatives are exactly the restricted-growth ("canonical") codes, and permuting colors
+        # commutes with permuting positions, so two colorings of the same color orbit have the same representative:
+        # it suffices to compute the symmetry minimum once per canonical code and to write it over the code's whole
+        # color orbit. The color-representative table itself is only a transient scratch of this construction.
+        low_bits, low_mask = self._low_bits, self._low_mask
+        color_repr_map = [None] * n_codes
+        canonical = list(canonical_coloring_codes(self.k))
+        for c in canonical:
+            for orbit_code in color_perm_codes(c, self.k):
+                color_repr_map[orbit_code] = c
+        self._full_repr = full_repr = [None] * n_codes
+        for c in canonical:
+            # For every coloring reachable from `c` by using a symmetry of the pattern, we consider its
+            # color-representative, and the lowest of those is the representative of `c` — and, by the commutation
+            # above, of every color-equivalent of `c`.
+            rep = min(color_repr_map[high[c >> low_bits] | low[c & low_mask]] for high, low in self._sym_tables)
+            if rep == c:
+                self._representatives.append(c)
+            for orbit_code in color_perm_codes(c, self.k):
+                full_repr[orbit_code] = rep
+
+        # For every representative, the first step towards its reducibility and rank is to check whether it is
+        # extendable into a coloring of the line graph. The checks all query the same line graph with different
+        # outgoing constraints, so they go through `ThreeColoration.colorable_batch`: the representatives are in
+        # increasing code order, hence their color tuples share long prefixes, and the propagation of a shared
+        # prefix is done only once (and may prune whole blocks before any solving). The parallel path splits the
+        # (still sorted) list into one contiguous slice per worker, keeping the prefix sharing within each slice.
+        base = ThreeColoration(self.line_graph)
+        assignments = [tuple(((c >> s) & 3) + 1 for s in self._shifts) for c in self._representatives]
+        if jobs != 1 and len(self._representatives) > 1:
+            workers = jobs or os.cpu_count() or 1  # `jobs = None` means one worker per core, like the executor.
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(base,)) as executor:
+                slice_len = -(-len(assignments) // workers)
+                slices = [assignments[i:i + slice_len] for i in range(0, len(assignments), slice_len)]
+                extendable = [ext for batch in executor.map(_colorable_batch, repeat(self.outgoing), slices)
+                              for ext in batch]
+        else:
+            extendable = base.colorable_batch(self.outgoing, assignments)
+
+        for c, ext in zip(self._representatives, extendable):
+            if ext:
+                # The frontier coloring `c` is extendable into a coloring, so it is reducible, of rank 0.
+                self._rank[c] = 0
+                self._reason[c] = "extendable"
+            # Otherwise `c` is not extendable into a coloring. We do not know yet if it is reducible; its rank
+            # stays at the `_INF_RANK` sentinel, which means it is considered non-reducible for now.
+
+        # Worklist of the representatives not yet known to be reducible. `is_pattern_reducible` iterates it and
+        # replaces it by the subset that stayed unresolved, so late rounds only scan the few remaining colorings
+        # instead of re-filtering every representative.
+        self._pending = [c for c in self._representatives if self._rank[c] == _INF_RANK]
+
+        # Reverse dependencies of the fixed point: maps an unranked representative to the set of pending colorings
+        # whose auxiliary graphs contain an edge for it, i.e. the colorings to re-test once it receives a rank.
+        self._blocked_by = {}
+
+        # Caches, per (coloring code, digit pair), the representative code of each swapped coloring computed by
+        # the auxiliary-graph builder: those only depend on the coloring and the color pair, not on the ranks
+        # known so far, so they can be reused across the iterations of `is_pattern_reducible`.
+        self._swap_repr_cache = {}
+
+        # The auxiliary-graph builder, partially evaluated against the tables of this instance (see
+        # `make_aux_builder`). Being a closure it cannot be pickled; `__getstate__` drops it when `self` is
+        # shipped to worker processes and `_make_aux_graph` rebuilds it lazily there.
+        self._build_aux = make_aux_builder(self._shifts, self._full_repr, self._rank, self._swap_repr_cache)
+
+    def __getstate__(self) -> dict:
+        """
+        Pickling support for the worker processes of `is_pattern_reducible`: the partially evaluated
+        auxiliary-graph builder is a closure, which pickle rejects, so it is stripped here and rebuilt lazily by
+        `_make_aux_graph` on the other side.
+        """
+        state = self.__dict__.copy()
+        state["_build_aux"] = None
+        return state
+
+    def _apply_symmetry(self, c: int, sym: list[int]) -> int:
+        """
+        Applies a symmetry of the pattern to a coloring. Kept as the scalar definition, used to build the
+        per-symmetry lookup tables of `__init__`; the hot paths go through the tables.
 
-        # The following two objects are used to determine which colorings are representatives.
+        :param c: A coloring code.
+        :param sym: A symmetry of the outgoing vertices, as a list of indices.
+        :return: The code of the coloring whose `i`-th color is the `sym[i]`-th color of `c`.
+        """
+        shifts = self._shifts
+        image = 0
+        for i in range(self.k):
+            image |= ((c >> shifts[sym[i]]) & 3) << shifts[i]
+        return image
 
-        # First layer maps each coloring to its color-representative.
-        # The color-representatives are the colorings that are their own color-representative.
-        self.color_repr_map = {}
+    @property
+    def repr_to_red(self) -> dict:
+        """
+        Read-only view of the reducibility data, mapping each representative coloring (as a tuple of colors) to its
+        rank and reason, in the historical dict-of-dicts form; built on demand from the internal parallel arrays.
+        """
+        return {code_to_coloring(c, self.k):
+                {"rank": float("inf") if self._rank[c] == _INF_RANK else self._rank[c],
+                 "reason": self._reason_text(c)}
+                for c in self._representatives}
 
-        # Second layer only considers the color-representatives for its keys.
-        # It maps a color-representative to its representative.
-        # The representatives are the colorings that are their own representative.
-        self.repr_map = {}
+    def _reason_text(self, c: int) -> str:
+        """
+        Formats the reason recorded for a representative. The solve loop only stores the color pair that proved a
+        coloring reducible; the human-readable string is built here, on demand, so the hot path does no string
+        formatting.
 
-        # We filter the colorings that are color-representatives.
-        for c in colorings(self.k):
-            # We compute the color-representative of `c` and store it.
-            self.color_repr_map[c] = color_repr(c)
-            if self.color_repr_map[c] == c:
-                # `c` is a color-representative, so we add it as a potential representative.
-                self.repr_map[c] = None
+        :param c: The code of a representative coloring.
+        :return: The reason string, empty if no rank was recorded for `c`.
+        """
+        reason = self._reason.get(c, "")
+        if isinstance(reason, tuple):
+            return f"reducible with color pair {reason[0]}/{reason[1]}"
+        return reason
 
-        # We filter the color-representatives that are representatives.
-        for c in self.repr_map.keys():
-            # For every coloring reachable from `c` by using a symmetry of the pattern, we consider its
-            # color-representative, and the lowest of those is the representative of `c`.
-            self.repr_map[c] = min((self.color_repr_map[c_sym] for c_sym in
-                                    (tuple(c[i] for i in sym) for sym in self.symmetries)),
-                                   key=coloring_to_int)
-            if self.repr_map[c] == c:
-                # `c` is a representative, so we want to compute its reducibility and rank. The first step is to
-                # check if it is extendable into a coloring, and put the result in the `self.repr_to_red` mapping.
-
-                # We build the `ThreeColoration` instance from the line graph by adding the constraints from `c`:
-                if ThreeColoration(self.line_graph, {self.outgoing[i]: c[i] for i in range(self.k)}).colorable():
-                    # The frontier coloring `c` is extendable into a coloring, so it is reducible, of rank 0.
-                    self.repr_to_red[c] = {"rank": 0, "reason": "extendable"}
-                else:
-                    # The frontier coloring `c` is not extendable into a coloring.
-                    # We do not know yet if it is reducible. For now, it is considered non-reducible.
-                    self.repr_to_red[c] = {"rank": float("inf"), "reason": ""}
-
-    def _representative(self, c: tuple[Color, ...]) -> tuple[Color, ...]:
+    def _representative(self, c: int) -> int:
         """
         Returns the representative of a coloring.
 
-        :param c: A coloring represented by a tuple of colors.
-        :return: The lexicographically minimal coloring equal to `c` up to a color permutation and a symmetry.
+        :param c: A coloring code.
+        :return: The code of the lexicographically minimal coloring equal to `c` up to a color permutation and a
+        symmetry.
         """
-        return self.repr_map[self.color_repr_map[c]]
+        return self._full_repr[c]
 
-    def _make_aux_graph(self, c: tuple[Color, ...], r: int, color_pair: tuple[Color, Color]):
+    def _make_aux_graph(self, c: int, r: int, color_pair: tuple[Color, Color]):
         """
         Returns the auxiliary graph of `c` with respect to Γ and `color_pair` where Γ is the set of the colorings
-        that are already proven of rank < `r`, i.e. Γ = {`c'` coloring such that `self.repr_to_red[c']["rank"] < r`}.
+        that are already proven of rank < `r`, i.e. Γ = {`c'` coloring such that the rank recorded for the
+        representative of `c'` is < `r`}.
 
-        :param c: A coloring represented by a tuple of colors.
+        :param c: A coloring code.
         :param r: A rank.
         :param color_pair: A pair of colors represented by a tuple of two colors.
         :return: The auxiliary graph of `c` with respect to the set of known colorings of rank < `r` and `color_pair`,
         as an instance of `NCPQMatching`.
         """
-        def swap(indices: set[int]) -> tuple[Color, ...]:
-            """
-            Switches the colors of the outgoing vertices listed in `indices`.
-
-            :param indices: One or two distinct outgoing vertices, given by a set of integers.
-            :return: The coloring obtained from `c` by switching the color assigned to the outgoing vertices
-            listed in `indices` from i to j or j to i, where (i, j) = `color_pair`.
-            """
-            res = list(c)
-            for index in indices:
-                if res[index] == color_pair[0]:
-                    res[index] = color_pair[1]
-                elif res[index] == color_pair[1]:
-                    res[index] = color_pair[0]
-            return tuple(res)
-
-        # `g` represents the auxiliary graph as a mapping from each vertex to its adjacency set.
-        g = {}
-        for i in range(self.k):
-            if c[i] in color_pair:
-                # If the `i`-th outgoing edge has a color from `color_pair`, we add `i` as a vertex of `g`.
-                g[i] = set()
-
-        for u in g.keys():
-            for v in g.keys():
-                # If `u` = `v`, `{u, v}` = `{u}` and we only swap the edge indexed by `u`.
-                if self.repr_to_red[self._representative(swap({u, v}))]["rank"] >= r:
-                    # We follow the rules given in definition 2.4 for adding edges and loops.
-                    g[u].add(v)
-                    g[v].add(u)
-        return NCPQMatching(g)
-
-    def _is_coloring_reducible(self, c: tuple[Color, ...], r: int):
+        # The integer work lives in the partially evaluated builder from `reductor_core`; the swap tables it
+        # builds do not depend on the rank bound, so they are cached across the iterations of
+        # `is_pattern_reducible`.
+        if self._build_aux is None:  # `self` was pickled to a worker process; rebuild the closure once.
+            self._build_aux = make_aux_builder(self._shifts, self._full_repr, self._rank, self._swap_repr_cache)
+        g = self._build_aux(c, r, color_pair[0] - 1, color_pair[1] - 1)
+        return NCPQMatching.from_bitmasks(g)
+
+    def _is_coloring_reducible(self, c: int, r: int):
         """
         Determines whether coloring `c` is reducible to the set of known colorings of rank < `r`.
 
-        :param c: A coloring represented by a tuple of colors.
+        :param c: A coloring code.
         :param r: A rank.
         :return: `{"reducible": True, "color pair": (i, j)}` if `c` is proven reducible using color pair `(i, j)`,
-        or `{"reducible": False, "color pair": ()}` if no color pair can achieve this.
+        or `{"reducible": False, "color pair": (), "blockers": B}` if no color pair can achieve this, where `B` is
+        the set of unranked representatives appearing in the swap tables of `c`: the auxiliary graphs of `c` can
+        only lose edges — hence the answer can only change — once one of those receives a rank.
         """
+        tested = []
         for color in range(1, 4):
             # We consider the Kempe chains using the two colors that are not `color`.
             color1, color2 = {1, 2, 3} - {color}
-            if c != tuple(Color(color) for _ in range(self.k)):
+            if c != self._mono[color - 1]:
                 # We do not consider the case where the auxiliary graph is empty — it is trivially matchable.
-                aux_graph = self._make_aux_graph(c, r, (Color(color1), Color(color2)))
+                aux_graph = self._make_aux_graph(c, r, (color1, color2))
                 if not aux_graph.matchable():
                     return {"reducible": True, "color pair": (color1, color2)}
-        return {"reducible": False, "color pair": ()}
-
-    def is_pattern_reducible(self, display=False) -> bool:
+                tested.append((color1 - 1, color2 - 1))
+        # `c` stays non-reducible for now; collect its blockers from the cached swap tables.
+        rank = self._rank
+        blockers = set()
+        for digit1, digit2 in tested:
+            _, reprs = self._swap_repr_cache[(c, digit1, digit2)]
+            for rep in reprs:
+                if rank[rep] == _INF_RANK:
+                    blockers.add(rep)
+        return {"reducible": False, "color pair": (), "blockers": blockers}
+
+    def is_pattern_reducible(self, display=False, jobs: int = 1) -> bool:
         """
         Computes the rank of every representative coloring of the pattern.
 
         :param display: Boolean value that defaults to `False`. If set to `True`, the method will display the reducible
         colorings, distributed among the various ranks, with a last category containing the non-reducible ones.
+        :param jobs: Number of worker processes used to check the unresolved colorings of each iteration; the checks
+        are independent read-only computations, so they can run in parallel. The default of `1` keeps everything in
+        the current process; `None` uses one worker per processor core.
         :return: `True` if the pattern is reducible (every representative coloring is reducible), `False` otherwise.
         """
-        found_changed = True
         i = 1
+        # The first iteration tests every unresolved coloring; afterwards, the worklist of an iteration is
+        # event-driven. The auxiliary graphs of a coloring can only lose edges as ranks are assigned, and they lose
+        # an edge entering iteration `i` + 1 exactly for the swap-representatives ranked `i`; so a coloring that
+        # stayed non-reducible is re-tested only when one of its blockers (see `_is_coloring_reducible`) receives a
+        # rank, and the assigned ranks are the same as with the full per-round sweeps.
+        worklist = list(self._pending)
 
         # Main loop. After the `i`-th iteration, every coloring `c` of rank <= `i` has its correct rank inscribed in
-        # `self.repr_to_red[c]["rank"]`.
-        while found_changed:
-            found_changed = False
-            found_non_reducible = False
-
-            # For each representative coloring `c`:
-            for c in self.repr_to_red.keys():
-                if self.repr_to_red[c]["rank"] == float("inf"):  # If `c` is not known to be reducible:
-                    # We re-check with our knowledge of colorings of rank < `i`.
-                    res = self._is_coloring_reducible(c, i)
-                    if res["reducible"]:
-                        found_changed = True  # At least one coloring of rank `i` has been found.
-                        self.repr_to_red[c]["rank"] = i
-                        color_pair = res["color pair"]
-                        self.repr_to_red[c]["reason"] = f"reducible with color pair " \
-                                                        f"{str(color_pair[0])}/{str(color_pair[1])}"
-                    else:
-                        found_non_reducible = True  # At least one coloring of rank > `i` has been found.
+        # `self._rank[c]`.
+        while worklist:
+            # The worklist is checked with our knowledge of the colorings of rank < `i`. A rank assigned during
+            # iteration `i` is not < `i`, so the checks of one iteration never depend on each other and their
+            # results can be gathered first and applied afterwards — which also makes them safe to run in parallel.
+            rank = self._rank
+            if jobs != 1 and len(worklist) > 1:
+                # Each worker gets a snapshot of `self`; results come back in order.
+                with ProcessPoolExecutor(max_workers=jobs) as executor:
+                    results = list(executor.map(self._is_coloring_reducible, worklist, repeat(i),
+                                                chunksize=max(1, len(worklist) // 16)))
+            else:
+                results = [self._is_coloring_reducible(c, i) for c in worklist]
+
+            triggered = set()
+            # First pass: register the blockers of the colorings that stayed non-reducible. This must happen
+            # before any rank of this iteration is applied (and before any `_blocked_by` entry is popped):
+            # blockers were snapshotted during the check phase, and one of them may be ranked by this very
+            # iteration — its waiters must still be woken, not silently dropped.
+            for c, res in zip(worklist, results):
+                if not res["reducible"]:
+                    for rep in res["blockers"]:
+                        if rank[rep] != _INF_RANK:
+                            # The blocker was ranked since the snapshot: the edge is about to disappear, so `c`
+                            # is re-tested directly instead of waiting on an already-ranked representative.
+                            triggered.add(c)
+                        else:
+                            self._blocked_by.setdefault(rep, set()).add(c)
+            # Second pass: apply the ranks and wake the waiters of the newly ranked colorings.
+            for c, res in zip(worklist, results):
+                if res["reducible"]:
+                    rank[c] = i
+                    # Only the pair is stored; `_reason_text` formats it if it is ever displayed.
+                    self._reason[c] = res["color pair"]
+                    # The colorings blocked on `c` see an edge disappear: re-test them next iteration.
+                    triggered.update(self._blocked_by.pop(c, ()))
+            self._pending = [c for c in self._pending if rank[c] == _INF_RANK]
+            worklist = sorted(c for c in triggered if rank[c] == _INF_RANK)
 
             i += 1
 
         if display:
-            # The last rank attributed to a coloring is `i - 2`.
-            for r in range(i - 1):
+            # Ranks run from 0 to the largest one attributed to a coloring.
+            last_rank = max((self._rank[c] for c in self._representatives
+                             if self._rank[c] != _INF_RANK), default=-1)
+            for r in range(last_rank + 1):
                 # Filters the representatives of rank `r`.
-                rank_r = [(c, red) for (c, red) in self.repr_to_red.items() if red["rank"] == r]
+                rank_r = [c for c in self._representatives if self._rank[c] == r]
                 nb_r = len(rank_r)
                 print(f"\nThere {'are' * (nb_r != 1)}{'is' * (nb_r == 1)} {nb_r} coloration{'s' * (nb_r != 1)}"
                       f" of rank {r}:\n")
-                for c, red in rank_r:
-                    print(f"{tuple(map(int,c))} because {red['reason']}.")
+                for c in rank_r:
+                    print(f"{code_to_coloring(c, self.k)} because {self._reason_text(c)}.")
 
             print("\nNon reducible colorations:\n")
-            for c, red in self.repr_to_red.items():
-                if red["rank"] == float("inf"):
-                    print(c)
-        return not found_non_reducible
+            for c in self._representatives:
+                if self._rank[c] == _INF_RANK:
+                    print(code_to_coloring(c, self.k))
+        # The pattern is reducible exactly when no representative is left on the worklist.
+        return not self._pending
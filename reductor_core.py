@@ -0,0 +1,81 @@
+"""
+Integer core of the pattern-reducibility fixed point.
+
+The functions here take the flat structures of `PatternReducibility` (coloring codes, the per-vertex bit shifts,
+the code-indexed representative and rank arrays) as explicit arguments and stick to integer and list operations:
+the hot loop is self-contained, free of attribute lookups, and its signatures are ready to be lowered to a compiled
+extension should the pure-Python version ever become the bottleneck again. The class methods of `reductor` are
+thin wrappers around these functions.
+"""
+
+from itertools import combinations
+
+
+def build_swap_table(c: int, flip: int, shifts: list, vertices: list, full_repr: list) -> tuple[list, list]:
+    """
+    Builds the swap table of a coloring for one color pair: for every subset `{u}` or `{u, v}` of the vertices
+    carrying a color of the pair, the representative of the coloring obtained by switching those colors. The table
+    does not depend on the ranks known so far, so callers cache it across fixed-point iterations.
+
+    :param c: A coloring code.
+    :param flip: The XOR of the two digits of the color pair.
+    :param shifts: The per-vertex bit shifts of the coloring codes.
+    :param vertices: The vertices of `c` carrying a color of the pair.
+    :param full_repr: The code-indexed (coloring -> representative) table.
+    :return: A pair of parallel lists: the vertex pairs (`(u, u)` for the single swaps) and the representative
+    code of each swapped coloring.
+    """
+    # The XOR mask of each vertex is computed once instead of being re-shifted in the pair loop.
+    flip_mask = {u: flip << shifts[u] for u in vertices}
+    pairs = [(u, u) for u in vertices] + list(combinations(vertices, 2))
+    reprs = [full_repr[c ^ flip_mask[u]] for u in vertices]
+    reprs += [full_repr[c ^ flip_mask[u] ^ flip_mask[v]] for u, v in combinations(vertices, 2)]
+    return pairs, reprs
+
+
+def make_aux_builder(shifts: list, full_repr: list, rank, swap_cache: dict):
+    """
+    Partially evaluates the auxiliary-graph construction for one `PatternReducibility` instance: the shift list
+    and the representative, rank and cache structures are bound once in the closure, so each call passes only the
+    values that actually vary — the coloring, the rank bound and the digit pair — and every table access inside
+    the loop is a local (cell) load rather than an argument or attribute lookup.
+
+    :param shifts: The per-vertex bit shifts of the coloring codes.
+    :param full_repr: The code-indexed (coloring -> representative) table.
+    :param rank: The code-indexed byte array of known ranks.
+    :param swap_cache: The (coloring, digit pair) -> swap table cache, filled on first use.
+    :return: A function `build(c, r, digit1, digit2)` returning the bitmask adjacency of the auxiliary graph of
+    coloring `c` with respect to the colorings of known rank < `r` and the color pair of digits `digit1` /
+    `digit2` (see `PatternReducibility._make_aux_graph` for the graph's definition).
+    """
+    # The (vertex, shift) pairs are materialized once instead of being rebuilt from `range(k)` on every call.
+    indexed_shifts = tuple(enumerate(shifts))
+
+    def build(c: int, r: int, digit1: int, digit2: int) -> dict[int, int]:
+        # In coded form, switching the color of an outgoing vertex between the two colors of the pair is a XOR of
+        # its digit with `digit1 ^ digit2` — provided the digit is one of the two, which holds for every vertex of
+        # the auxiliary graph by construction.
+
+        # `g` represents the auxiliary graph as a mapping from each vertex to the bitmask of its neighbours.
+        g = {}
+        for i, shift in indexed_shifts:
+            digit = (c >> shift) & 3
+            if digit == digit1 or digit == digit2:
+                # If the `i`-th outgoing edge has a color from the pair, we add `i` as a vertex of `g`.
+                g[i] = 0
+
+        key = (c, digit1, digit2)
+        table = swap_cache.get(key)
+        if table is None:
+            table = build_swap_table(c, digit1 ^ digit2, shifts, list(g.keys()), full_repr)
+            swap_cache[key] = table
+
+        for (u, v), rep in zip(*table):
+            # If `u` = `v`, `{u, v}` = `{u}` and only the edge indexed by `u` is swapped (a loop of `g`).
+            if rank[rep] >= r:
+                # We follow the rules given in definition 2.4 for adding edges and loops.
+                g[u] |= 1 << v
+                g[v] |= 1 << u
+        return g
+
+    return build
@@ -1,12 +1,12 @@
-from enum import IntEnum
 from itertools import product, permutations
 
-
-class Color(IntEnum):
-    ONE = 1
-    TWO = 2
-    THREE = 3
-    NONE = 0
+# Colors are plain small integers: 1, 2, 3 for the three colors and 0 for "no color" (an unconstrained vertex).
+# They used to be an `IntEnum`, but every `Color(...)` construction went through the enum machinery, which is
+# measurable on paths that touch millions of colors; small ints are interned by CPython and compare directly.
+# The alias keeps the annotations (and external callers) readable.
+Color = int
+COLOR_NONE = 0
+COLOR_SET = (1, 2, 3)
 
 
 def colorings(n: int):
@@ -16,28 +16,24 @@ def colorings(n: int):
     :param n: The number of vertices to be colored.
     :return: A generator enumerating the `n`-tuples composed of colors 1 to 3.
     """
-    return product([Color.ONE, Color.TWO, Color.THREE], repeat=n)
-
+    return product(COLOR_SET, repeat=n)
 
-def _color_permutations():
-    """
-    Enumerates the 6 color permutations.
 
-    :return: A generator enumerating the 6 permutations of the 3 colors.
-    """
-    for sigma in permutations((1, 2, 3), 3):
-        yield {Color(i + 1): Color(sigma[i]) for i in range(3)}
+# The 6 color permutations as length-4 lookup tables indexed by color (entry 0 maps the "no color" value to
+# itself). Tuples are precomputed at import time: indexing a small tuple is cheaper than hashing into the
+# 3-entry dictionaries these used to be.
+PERMS = tuple((0,) + p for p in permutations((1, 2, 3)))
 
 
-def _permute(coloring: tuple[Color, ...], sigma: dict[Color, Color]) -> tuple[Color, ...]:
+def _permute(coloring: tuple[Color, ...], perm: tuple) -> tuple[Color, ...]:
     """
     Composes a permutation with a coloring.
 
     :param coloring: A coloring represented by a tuple of colors.
-    :param sigma: A color permutation represented by a `Color` -> `Color` mapping.
-    :return: The coloring `sigma` circle `coloring`.
+    :param perm: A color permutation represented by a length-4 lookup table indexed by color.
+    :return: The coloring `perm` circle `coloring`.
     """
-    return tuple(sigma[c] for c in coloring)
+    return tuple(perm[c] for c in coloring)
 
 
 def coloring_to_int(coloring: tuple[Color, ...]) -> int:
@@ -47,7 +43,124 @@ def coloring_to_int(coloring: tuple[Color, ...]) -> int:
     :param coloring: A coloring represented by a tuple of colors.
     :return: The integer representation of `coloring`.
     """
-    return int("".join([str(int(color)) for color in coloring]))
+    value = 0
+    for color in coloring:
+        value = value * 10 + color
+    return value
+
+
+# Colorings are also manipulated in integer-coded form: a coloring of `n` vertices is packed into an integer with
+# 2 bits per vertex holding (color - 1), the first vertex in the most significant pair of bits. Packing big-endian
+# makes the numeric order on codes coincide with the lexicographic order on colorings, so taking a minimum of codes
+# needs no key function, and dictionaries keyed by colorings become plain lists indexed by code.
+
+# The 6 permutations of the digits {0, 1, 2}, indexed by digit (entry 3 is unused padding).
+_DIGIT_PERMS = tuple(p + (3,) for p in permutations((0, 1, 2)))
+
+
+def coloring_codes(n: int):
+    """
+    Enumerates the colorings of `n` vertices in integer-coded form.
+
+    :param n: The number of vertices to be colored.
+    :return: A generator enumerating the codes of the `n`-vertex colorings, in increasing order.
+    """
+    for digits in product((0, 1, 2), repeat=n):
+        code = 0
+        for digit in digits:
+            code = (code << 2) | digit
+        yield code
+
+
+def coloring_to_code(coloring: tuple[Color, ...]) -> int:
+    """
+    Computes the integer code of a coloring.
+
+    :param coloring: A coloring represented by a tuple of colors.
+    :return: The integer code of `coloring`.
+    """
+    code = 0
+    for color in coloring:
+        code = (code << 2) | (color - 1)
+    return code
+
+
+def code_to_coloring(code: int, n: int) -> tuple[Color, ...]:
+    """
+    Computes the coloring encoded by an integer code.
+
+    :param code: The integer code of a coloring.
+    :param n: The number of vertices of the coloring.
+    :return: The coloring represented by a tuple of colors.
+    """
+    return tuple(((code >> (2 * (n - 1 - i))) & 3) + 1 for i in range(n))
+
+
+def _permute_code(code: int, perm: tuple, n: int) -> int:
+    """
+    Applies a digit permutation to a coloring code.
+
+    :param code: The integer code of a coloring.
+    :param perm: A permutation of the digits {0, 1, 2}, as an index-able of length at least 3.
+    :param n: The number of vertices of the coloring.
+    :return: The code obtained from `code` by mapping every digit `d` to `perm[d]`.
+    """
+    permuted = 0
+    for shift in range(0, 2 * n, 2):
+        permuted |= perm[(code >> shift) & 3] << shift
+    return permuted
+
+
+def color_repr_code(code: int, n: int) -> int:
+    """
+    Computes the minimal coloring code equal to `code` up to color permutation; this is the integer-coded
+    counterpart of `color_repr`.
+
+    :param code: The integer code of a coloring.
+    :param n: The number of vertices of the coloring.
+    :return: The minimum code among the color permutations of `code`.
+    """
+    best = code
+    for perm in _DIGIT_PERMS[1:]:  # The first permutation is the identity, covered by `best` already.
+        permuted = _permute_code(code, perm, n)
+        if permuted < best:
+            best = permuted
+    return best
+
+
+def canonical_coloring_codes(n: int):
+    """
+    Enumerates directly the codes of the colorings that are their own color-representative, i.e. the
+    lexicographically minimal element of their color orbit. These are exactly the restricted-growth colorings:
+    reading left to right, the first occurrence of each color is in the order 1, 2, 3. Enumerating them directly
+    visits ~3^n / 6 codes instead of filtering all 3^n.
+
+    :param n: The number of vertices to be colored.
+    :return: A generator enumerating the canonical codes, in increasing order.
+    """
+    def _extend(code: int, pos: int, used: int):
+        if pos == n:
+            yield code
+            return
+        # A position may carry an already-used color, or introduce the next unused one (colors are introduced in
+        # increasing order, which is what makes the coloring lexicographically minimal in its orbit).
+        for digit in range(min(used + 1, 3)):
+            yield from _extend((code << 2) | digit, pos + 1, max(used, digit + 1))
+    yield from _extend(0, 0, 0)
+
+
+def color_perm_codes(code: int, n: int):
+    """
+    Enumerates the images of a coloring code under the 6 color permutations, the identity first.
+
+    :param code: The integer code of a coloring.
+    :param n: The number of vertices of the coloring.
+    :return: A generator enumerating the 6 permuted codes (with repetitions when the coloring uses fewer than
+    3 colors).
+    """
+    yield code
+    for perm in _DIGIT_PERMS[1:]:
+        yield _permute_code(code, perm, n)
 
 
 def color_repr(coloring: tuple[Color, ...]) -> tuple[Color, ...]:
@@ -57,5 +170,5 @@ def color_repr(coloring: tuple[Color, ...]) -> tuple[Color, ...]:
     :param coloring: A coloring represented by a tuple of colors.
     :return: The minimum color permutation of `coloring` according to the lexicographic order.
     """
-    return min((_permute(coloring, sigma) for sigma in _color_permutations()),
-               key=coloring_to_int)
+    # Tuples of colors compare lexicographically, which is exactly the `coloring_to_int` order, so no key is needed.
+    return min(_permute(coloring, perm) for perm in PERMS)